@@ -1,10 +1,20 @@
 import json
+import re
 import pulumi
 from pulumi import ResourceOptions, Config
 import pulumi_aws as aws
-import pulumi_docker_build as docker_build
-import base64
-from typing import Optional, TypedDict, Dict, List
+import functools
+from binascii import a2b_base64
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Optional, TypedDict, Dict, List
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    import pulumi_docker_build as docker_build
 
 class ContainerAppArgs(TypedDict):
     """Arguments for the ContainerApp component."""
@@ -21,6 +31,185 @@ class ContainerAppArgs(TypedDict):
     owner: Optional[pulumi.Input[str]]  # Owner tag value
     image: Optional[pulumi.Input[str]]  # Optional Docker image to use instead of building from app_path
     department: Optional[pulumi.Input[str]]  # Optional department tag value
+    shared: Optional[bool]  # Reuse one VPC and ECS cluster across components in the stack
+
+def _compact_json(obj) -> str:
+    """Serialize obj to compact JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+# Secret references ECS accepts in valueFrom, in any partition (aws, aws-cn,
+# aws-us-gov, ...): a full or partial secret ARN, optionally followed by the
+# ":json-key:version-stage:version-id" selector
+_SECRETS_MANAGER_ARN = re.compile(
+    r"arn:aws[\w-]*:secretsmanager:[\w-]+:\d{12}:secret:[\w/+=.@-]+(:[^:]*:[^:]*:[^:]*)?"
+)
+# Random suffix Secrets Manager appends to every full secret ARN
+_SECRET_ARN_SUFFIX = re.compile(r"-[A-Za-z0-9]{6}")
+
+def _secret_policy_arn(value: str) -> str:
+    """IAM resource for a secret reference: the bare secret ARN, wildcarding a missing suffix."""
+    arn = ":".join(value.split(":")[:7])
+    if not _SECRET_ARN_SUFFIX.fullmatch(arn[-7:]):
+        arn += "-??????"
+    return arn
+
+# Defaults for optional ContainerApp arguments
+_DEFAULTS = {"cpu": "256", "memory": "512", "desired_count": 2}
+
+# Infrastructure shared by components created with shared=True, keyed by
+# (region, stack)
+_shared_infra: Dict[tuple, "SharedInfra"] = {}
+_SHARED_PREFIX = "container-app-shared"
+
+# Trust policy letting ECS tasks assume the task execution role
+_ECS_TASKS_ASSUME_ROLE_POLICY = _compact_json({
+    "Version": "2008-10-17",
+    "Statement": [{
+        "Effect": "Allow",
+        "Principal": {"Service": "ecs-tasks.amazonaws.com"},
+        "Action": "sts:AssumeRole"
+    }]
+})
+
+# Static scaffolding of the task's container definition. Only the dynamic
+# fields are serialized per apply; each placeholder receives JSON text.
+_CONTAINER_DEF_TEMPLATE = (
+    '[{{"name":"app","image":{image},"essential":true,'
+    '"portMappings":[{{"containerPort":{port},"hostPort":{port},"protocol":"tcp"}}],'
+    '"environment":{environment},"secrets":{secrets},'
+    '"logConfiguration":{{"logDriver":"awslogs","options":{{"awslogs-group":{log_group},'
+    '"awslogs-region":{region},"awslogs-stream-prefix":"app"}}}}}}]'
+)
+
+# Provider lookups below are shared by every ContainerApp in the program, so
+# N components cost one round-trip each rather than N.
+
+@functools.lru_cache(maxsize=None)
+def _availability_zone_names() -> pulumi.Output[List[str]]:
+    """Names of the availability zones currently available in the region."""
+    return aws.get_availability_zones_output(state="available").names
+
+@functools.lru_cache(maxsize=16)
+def _get_registry_info(registry_id: str) -> "docker_build.RegistryArgs":
+    """Fetch and decode the ECR push credentials for a registry."""
+    import pulumi_docker_build as docker_build
+
+    creds = aws.ecr.get_credentials(registry_id=registry_id)
+    # Split the raw token as bytes and decode only the two halves
+    username, sep, password = a2b_base64(creds.authorization_token).partition(b":")
+    if not sep:
+        raise Exception("Invalid credentials")
+    return docker_build.RegistryArgs(
+        address=creds.proxy_endpoint,
+        username=username.decode("ascii"),
+        password=password.decode("ascii")
+    )
+
+def _create_network(prefix: str, tags: Dict[str, str], opts: pulumi.ResourceOptions):
+    """Create a VPC with two public subnets, returning (vpc_id, subnet_ids)."""
+    vpc = aws.ec2.Vpc(f"{prefix}-vpc",
+        cidr_block="10.0.0.0/16",
+        enable_dns_hostnames=True,
+        enable_dns_support=True,
+        tags=tags,
+        opts=opts
+    )
+    igw = aws.ec2.InternetGateway(f"{prefix}-igw",
+        vpc_id=vpc.id,
+        tags=tags,
+        opts=opts
+    )
+    route_table = aws.ec2.RouteTable(f"{prefix}-public-rt",
+        vpc_id=vpc.id,
+        routes=[{"cidr_block": "0.0.0.0/0", "gateway_id": igw.id}],
+        tags=tags,
+        opts=opts
+    )
+    # The AZ lookup resolves asynchronously; each subnet picks its zone
+    # by index once the names are known
+    azs = _availability_zone_names()
+    # Declare every subnet before its route table association so the
+    # engine sees all siblings up front
+    subnet_objs = [
+        aws.ec2.Subnet(f"{prefix}-subnet-{i+1}",
+            vpc_id=vpc.id,
+            availability_zone=azs.apply(lambda names, i=i: names[i]),
+            cidr_block=f"10.0.{i}.0/24",
+            map_public_ip_on_launch=True,
+            tags=tags,
+            opts=opts
+        )
+        for i in range(2)
+    ]
+    for i, subnet in enumerate(subnet_objs):
+        aws.ec2.RouteTableAssociation(f"{prefix}-subnet-{i+1}-assoc",
+            subnet_id=subnet.id,
+            route_table_id=route_table.id,
+            opts=opts
+        )
+    return vpc.id, [subnet.id for subnet in subnet_objs]
+
+def _as_int_str(value, default) -> str:
+    """Format a numeric input as an integer string, since it may come through as a float."""
+    return f"{int(float(value if value is not None else default))}"
+
+def _normalize_args(args: ContainerAppArgs) -> SimpleNamespace:
+    """Extract every ContainerApp argument once, applying defaults and casts."""
+    app_port = args["app_port"]
+    # Coerce the port once; it may arrive as a float or as an Output
+    if isinstance(app_port, pulumi.Output):
+        app_port = app_port.apply(int)
+    else:
+        app_port = int(app_port)
+    return SimpleNamespace(
+        app_path=args.get("app_path"),
+        app_port=app_port,
+        cpu=_as_int_str(args.get("cpu"), _DEFAULTS["cpu"]),
+        memory=_as_int_str(args.get("memory"), _DEFAULTS["memory"]),
+        desired_count=args.get("desired_count", _DEFAULTS["desired_count"]),
+        vpc_id=args.get("vpc_id"),
+        public_subnet_ids=args.get("public_subnet_ids"),
+        alb_cert_arn=args.get("alb_cert_arn"),
+        env=args.get("env", {}),
+        secrets=args.get("secrets", {}),
+        image=args.get("image"),
+        owner=args.get("owner"),
+        department=args.get("department"),
+        shared=bool(args.get("shared", False)),
+    )
+
+class SharedInfra(pulumi.ComponentResource):
+    """The VPC and ECS cluster reused by every `shared` ContainerApp in a stack.
+
+    Registered once per (region, stack) at the stack root with the default
+    provider, so its URN, tags and options never depend on which ContainerApp
+    asked for it first. Children are created on first use.
+    """
+
+    def __init__(self):
+        super().__init__("container-app:index:SharedInfra", _SHARED_PREFIX)
+        self._child_opts = pulumi.ResourceOptions(parent=self)
+        self._tags = {"Name": _SHARED_PREFIX}
+        self._network = None
+        self._cluster = None
+        self.register_outputs({})
+
+    def network(self):
+        """The shared VPC and public subnets as (vpc_id, subnet_ids)."""
+        if self._network is None:
+            self._network = _create_network(_SHARED_PREFIX, self._tags, self._child_opts)
+        return self._network
+
+    def cluster(self) -> aws.ecs.Cluster:
+        """The shared ECS cluster."""
+        if self._cluster is None:
+            self._cluster = aws.ecs.Cluster(f"{_SHARED_PREFIX}-cluster",
+                tags=self._tags,
+                opts=self._child_opts
+            )
+        return self._cluster
 
 class ContainerApp(pulumi.ComponentResource):
     """A component that deploys a containerized application to AWS ECS Fargate."""
@@ -38,37 +227,29 @@ class ContainerApp(pulumi.ComponentResource):
         child_opts = pulumi.ResourceOptions(parent=self)
 
         # Get configuration values with defaults
-        app_path = args.get("app_path")
-        app_port = args["app_port"]
-        cpu = str(int(args.get("cpu", "256")))  # Convert to int then string because it's coming through as a float otherwise
-        memory = str(int(args.get("memory", "512"))) # Convert to int then string because it's coming through as a float otherwise
-        desired_count = args.get("desired_count", 2)
-        vpc_id = args.get("vpc_id")
-        public_subnet_ids = args.get("public_subnet_ids")
-        alb_cert_arn = args.get("alb_cert_arn")
-        env = args.get("env", {})
-        secrets = args.get("secrets", {})
-        image = args.get("image")
-        owner = args.get("owner")
-        department = args.get("department")
+        app_args = _normalize_args(args)
         # Validate that either app_path or image is provided
-        if not app_path and not image and not (app_path == "none" or image == "none"):
+        if not app_args.app_path and not app_args.image and not (app_args.app_path == "none" or app_args.image == "none"):
             raise ValueError("Either app_path or image must be provided")
 
         # Create a common tags dictionary
         common_tags = {"Name": name}
-        if owner:
-            common_tags["Owner"] = owner
-        if department:
-            common_tags["Department"] = department
+        if app_args.owner:
+            common_tags["Owner"] = app_args.owner
+        if app_args.department:
+            common_tags["Department"] = app_args.department
 
         # Log the CPU and memory values
-        pulumi.log.info(f"CPU: {cpu}, Memory: {memory}")
+        pulumi.log.info(f"CPU: {app_args.cpu}, Memory: {app_args.memory}")
 
         # Create secrets manager secrets
         secret_arns_map = {}
-        if secrets:
-            for key, value in secrets.items():
+        if app_args.secrets:
+            for key, value in app_args.secrets.items():
+                # Reference existing secrets directly instead of copying them
+                if isinstance(value, str) and _SECRETS_MANAGER_ARN.fullmatch(value):
+                    secret_arns_map[key] = value
+                    continue
                 secret = aws.secretsmanager.Secret(key,
                     description=f"{key} for {name}",
                     tags={**common_tags, "Name": key},
@@ -84,139 +265,59 @@ class ContainerApp(pulumi.ComponentResource):
         # Get AWS region from config
         aws_region = Config("aws").require("region")
 
-        # (1) Networking: Use provided VPC/subnets or create new ones
-        if vpc_id and public_subnet_ids:
-            vpc = aws.ec2.get_vpc(id=vpc_id)
-            subnets = public_subnet_ids
-        else:
-            # Create new VPC with two public subnets
-            vpc = aws.ec2.Vpc(f"{name}-vpc",
-                cidr_block="10.0.0.0/16",
-                enable_dns_hostnames=True,
-                enable_dns_support=True,
-                tags=common_tags,
-                opts=child_opts
-            )
-            igw = aws.ec2.InternetGateway(f"{name}-igw",
-                vpc_id=vpc.id,
-                tags=common_tags,
-                opts=child_opts
-            )
-            route_table = aws.ec2.RouteTable(f"{name}-public-rt",
-                vpc_id=vpc.id,
-                routes=[{"cidr_block": "0.0.0.0/0", "gateway_id": igw.id}],
+        # (1) ECR Repository and Docker image
+        # Registered first so the image build, usually the longest step, runs
+        # alongside the networking resources below.
+        if app_args.app_path and app_args.app_path != "none":
+            # Only the build path needs the docker-build SDK, so load it lazily
+            import pulumi_docker_build as docker_build
+
+            repository = aws.ecr.Repository(f"{name}-repo",
                 tags=common_tags,
+                force_delete=True,
                 opts=child_opts
             )
-            azs = aws.get_availability_zones().names[:2]
-            subnets = []
-            for i, az in enumerate(azs):
-                subnet = aws.ec2.Subnet(f"{name}-subnet-{i+1}",
-                    vpc_id=vpc.id,
-                    availability_zone=az,
-                    cidr_block=f"10.0.{i}.0/24",
-                    map_public_ip_on_launch=True,
-                    tags=common_tags,
-                    opts=child_opts
-                )
-                aws.ec2.RouteTableAssociation(f"{name}-subnet-{i+1}-assoc",
-                    subnet_id=subnet.id,
-                    route_table_id=route_table.id,
-                    opts=child_opts
-                )
-                subnets.append(subnet.id)
-
-        # (2) Security Group
-        web_sg = aws.ec2.SecurityGroup(f"{name}-web-sg",
-            vpc_id=vpc.id,
-            description="Security group for web LB and ECS tasks",
-            ingress=[
-                {"protocol": "tcp", "from_port": 80, "to_port": 80, "cidr_blocks": ["0.0.0.0/0"]},
-                {"protocol": "tcp", "from_port": 443, "to_port": 443, "cidr_blocks": ["0.0.0.0/0"]},
-                {"protocol": "tcp", "from_port": 8080, "to_port": 8080, "self":True}
-            ],
-            egress=[
-                {"protocol": "-1", "from_port": 0, "to_port": 0, "cidr_blocks": ["0.0.0.0/0"]}
-            ],
-            tags=common_tags,
-            opts=child_opts
-        )
 
-        # (3) ECS Cluster
-        cluster = aws.ecs.Cluster(f"{name}-cluster",
-            tags=common_tags,
-            opts=child_opts
-        )
+            registry = repository.registry_id.apply(_get_registry_info)
 
-        # (4) Load Balancer & Target Group
-        alb = aws.lb.LoadBalancer(f"{name}-lb",
-            security_groups=[web_sg.id],
-            subnets=subnets,
-            load_balancer_type="application",
-            tags=common_tags,
-            opts=child_opts
-        )
-        target_group = aws.lb.TargetGroup(f"{name}-tg",
-            port=app_port,
-            protocol="HTTP",
-            target_type="ip",
-            vpc_id=vpc.id,
-            health_check={
-                "path": "/",
-                "port": "traffic-port",
-                "interval": 90,
-                "timeout": 15,
-                "healthy_threshold": 2,
-                "unhealthy_threshold": 5,
-                "matcher": "200"
-            },
-            tags=common_tags,
-            opts=child_opts
-        )
+            # Keep BuildKit layers in the repository so unchanged layers aren't rebuilt
+            cache_ref = repository.repository_url.apply(lambda url: f"{url}:buildcache")
 
-        # (5) ALB Listeners
-        if alb_cert_arn:
-            https_listener = aws.lb.Listener(f"{name}-https-listener",
-                load_balancer_arn=alb.arn,
-                port=443,
-                protocol="HTTPS",
-                ssl_policy="ELBSecurityPolicy-2016-08",
-                certificate_arn=alb_cert_arn,
-                default_actions=[{"type": "forward", "target_group_arn": target_group.arn}],
-                tags=common_tags,
-                opts=child_opts
-            )
-            http_listener = aws.lb.Listener(f"{name}-http-listener",
-                load_balancer_arn=alb.arn,
-                port=80,
-                protocol="HTTP",
-                default_actions=[{
-                    "type": "redirect",
-                    "redirect": {"protocol": "HTTPS", "port": "443", "status_code": "HTTP_301"}
-                }],
-                tags=common_tags,
+            built_image = docker_build.Image(
+                f"{name}-image",
+                context=docker_build.BuildContextArgs(
+                    location=app_args.app_path,
+                ),
+                platforms=["linux/amd64"],
+                cache_from=[docker_build.CacheFromArgs(
+                    registry=docker_build.CacheFromRegistryArgs(ref=cache_ref),
+                )],
+                cache_to=[docker_build.CacheToArgs(
+                    registry=docker_build.CacheToRegistryArgs(
+                        ref=cache_ref,
+                        mode=docker_build.CacheMode.MAX,
+                        # ECR only accepts cache manifests in the OCI image format
+                        image_manifest=True,
+                        oci_media_types=True,
+                    ),
+                )],
+                push=True,
+                registries=[registry],
+                tags=[
+                    repository.repository_url.apply(lambda url: f"{url}:latest"),
+                ],
                 opts=child_opts
             )
+            # The pushed ref is pinned to the image digest, so the task definition
+            # only changes when the image does and waits for the push to finish
+            image_url = built_image.ref
         else:
-            http_listener = aws.lb.Listener(f"{name}-http-listener",
-                load_balancer_arn=alb.arn,
-                port=80,
-                protocol="HTTP",
-                default_actions=[{"type": "forward", "target_group_arn": target_group.arn}],
-                tags=common_tags,
-                opts=child_opts
-            )
+            # Use the provided image as-is; a plain string needs no Output wrapper
+            image_url = app_args.image
 
-        # (6) IAM Roles
+        # (2) IAM Roles
         task_exec_role = aws.iam.Role(f"{name}-task-exec-role",
-            assume_role_policy=json.dumps({
-                "Version": "2008-10-17",
-                "Statement": [{
-                    "Effect": "Allow",
-                    "Principal": {"Service": "ecs-tasks.amazonaws.com"},
-                    "Action": "sts:AssumeRole"
-                }]
-            }),
+            assume_role_policy=_ECS_TASKS_ASSUME_ROLE_POLICY,
             tags=common_tags,
             opts=child_opts
         )
@@ -228,21 +329,25 @@ class ContainerApp(pulumi.ComponentResource):
 
         # Add Secrets Manager policy if there are secrets
         if len(secret_arns_map) > 0:
-            # Get the ARNs directly from the dictionary values
-            secret_arns = list(secret_arns_map.values())
-            policy_doc = pulumi.Output.all(secret_arns).apply(lambda x: {
+            # Created secrets contribute their ARN Outputs; existing secrets are
+            # valueFrom strings, trimmed back to the secret ARN the policy needs
+            secret_arns = [
+                _secret_policy_arn(arn) if isinstance(arn, str) else arn
+                for arn in secret_arns_map.values()
+            ]
+            policy_doc = pulumi.Output.all(*secret_arns).apply(lambda arns: _compact_json({
                 "Version": "2012-10-17",
                 "Statement": [{
                     "Effect": "Allow",
                     "Action": [
                         "secretsmanager:GetSecretValue"
                     ],
-                    "Resource": x[0]
+                    "Resource": list(arns)
                 }]
-            })
-            
+            }))
+
             secrets_policy = aws.iam.Policy(f"{name}-secrets-manager-policy",
-                policy=policy_doc.apply(lambda doc: json.dumps(doc)),
+                policy=policy_doc,
                 tags=common_tags,
                 opts=child_opts
             )
@@ -254,80 +359,158 @@ class ContainerApp(pulumi.ComponentResource):
                 opts=child_opts
             )
 
-        # (7) Log Group
+        # (3) Log Group
         log_group = aws.cloudwatch.LogGroup(f"{name}-logs",
             retention_in_days=7,
             tags=common_tags,
             opts=child_opts
         )
 
-        # (8) ECR Repository and Docker image
-        if app_path and app_path != "none":
-            repository = aws.ecr.Repository(f"{name}-repo",
-                tags=common_tags,
-                force_delete=True,
-                opts=child_opts
-            )
+        # Shared infrastructure uses the default provider for aws_region, so it
+        # cannot serve a component bound to an explicit provider
+        shared = None
+        if app_args.shared:
+            if opts is not None and (opts.provider or opts.providers):
+                raise ValueError("shared cannot be combined with an explicit provider")
+            shared_key = (aws_region, pulumi.get_stack())
+            if shared_key not in _shared_infra:
+                _shared_infra[shared_key] = SharedInfra()
+            shared = _shared_infra[shared_key]
 
-            def get_registry_info(rid):
-                creds = aws.ecr.get_credentials(registry_id=rid)
-                decoded = base64.b64decode(creds.authorization_token).decode()
-                parts = decoded.split(":")
-                if len(parts) != 2:
-                    raise Exception("Invalid credentials")
-                return docker_build.RegistryArgs(
-                    address=creds.proxy_endpoint,
-                    username=parts[0],
-                    password=parts[1]
-                )
+        # (4) Networking: Use provided VPC/subnets, shared ones, or create new ones
+        if app_args.vpc_id and app_args.public_subnet_ids:
+            # Only the ID is needed downstream, so skip looking the VPC up
+            vpc_id = app_args.vpc_id
+            subnets = app_args.public_subnet_ids
+        elif shared is not None:
+            vpc_id, subnets = shared.network()
+        else:
+            # Create new VPC with two public subnets
+            vpc_id, subnets = _create_network(name, common_tags, child_opts)
 
-            registry = repository.registry_id.apply(get_registry_info)
+        # (5) Security Group
+        web_sg = aws.ec2.SecurityGroup(f"{name}-web-sg",
+            vpc_id=vpc_id,
+            description="Security group for web LB and ECS tasks",
+            ingress=[
+                {"protocol": "tcp", "from_port": 80, "to_port": 80, "cidr_blocks": ["0.0.0.0/0"]},
+                {"protocol": "tcp", "from_port": 443, "to_port": 443, "cidr_blocks": ["0.0.0.0/0"]},
+                {"protocol": "tcp", "from_port": 8080, "to_port": 8080, "self":True}
+            ],
+            egress=[
+                {"protocol": "-1", "from_port": 0, "to_port": 0, "cidr_blocks": ["0.0.0.0/0"]}
+            ],
+            tags=common_tags,
+            opts=child_opts
+        )
 
-            built_image = docker_build.Image(
-                f"{name}-image",
-                context=docker_build.BuildContextArgs(
-                    location=app_path,
-                ),
-                platforms=["linux/amd64"],
-                push=True,
-                registries=[registry],
-                tags=[
-                    repository.repository_url.apply(lambda url: f"{url}:latest"),
-                ],
+        # (6) ECS Cluster
+        if shared is not None:
+            cluster = shared.cluster()
+        else:
+            cluster = aws.ecs.Cluster(f"{name}-cluster",
+                tags=common_tags,
                 opts=child_opts
             )
-            image_url = repository.repository_url.apply(lambda url: f"{url}:latest")
+
+        # (7) Load Balancer & Target Group
+        alb = aws.lb.LoadBalancer(f"{name}-lb",
+            security_groups=[web_sg.id],
+            subnets=subnets,
+            load_balancer_type="application",
+            tags=common_tags,
+            opts=child_opts
+        )
+        target_group = aws.lb.TargetGroup(f"{name}-tg",
+            port=app_args.app_port,
+            protocol="HTTP",
+            target_type="ip",
+            vpc_id=vpc_id,
+            health_check={
+                "path": "/",
+                "port": "traffic-port",
+                "interval": 90,
+                "timeout": 15,
+                "healthy_threshold": 2,
+                "unhealthy_threshold": 5,
+                "matcher": "200"
+            },
+            tags=common_tags,
+            opts=child_opts
+        )
+
+        # (8) ALB Listeners
+        forward_actions = [{"type": "forward", "target_group_arn": target_group.arn}]
+        if app_args.alb_cert_arn:
+            listener_specs = [
+                {
+                    "resource_name": f"{name}-https-listener",
+                    "port": 443,
+                    "protocol": "HTTPS",
+                    "ssl_policy": "ELBSecurityPolicy-2016-08",
+                    "certificate_arn": app_args.alb_cert_arn,
+                    "default_actions": forward_actions,
+                },
+                {
+                    "resource_name": f"{name}-http-listener",
+                    "port": 80,
+                    "protocol": "HTTP",
+                    "default_actions": [{
+                        "type": "redirect",
+                        "redirect": {"protocol": "HTTPS", "port": "443", "status_code": "HTTP_301"}
+                    }],
+                },
+            ]
         else:
-            # Use the provided image
-            image_url = pulumi.Output.from_input(image)
+            listener_specs = [
+                {
+                    "resource_name": f"{name}-http-listener",
+                    "port": 80,
+                    "protocol": "HTTP",
+                    "default_actions": forward_actions,
+                },
+            ]
+        listener_common = {"load_balancer_arn": alb.arn, "tags": common_tags}
+        listeners = [
+            aws.lb.Listener(**{**listener_common, **spec}, opts=child_opts)
+            for spec in listener_specs
+        ]
 
         # (9) ECS Task Definition
-        container_def = pulumi.Output.all(
-            image_url,
-            log_group.name,
-            env,
-            secret_arns_map
-        ).apply(lambda args: json.dumps([{
-            "name": "app",
-            "image": args[0],
-            "essential": True,
-            "portMappings": [{"containerPort": int(app_port), "hostPort": int(app_port), "protocol": "tcp"}],
-            "environment": [{"name": k, "value": v} for k, v in args[2].items()],
-            "secrets": [{"name": k, "valueFrom": v} for k, v in args[3].items()],
-            "logConfiguration": {
-                "logDriver": "awslogs",
-                "options": {
-                    "awslogs-group": args[1],
-                    "awslogs-region": aws_region,
-                    "awslogs-stream-prefix": "app"
-                }
-            }
-        }]))
+        # Only the dict values can be Outputs, so resolve those and rebuild the
+        # mappings from the keys captured here.
+        env_keys = list(app_args.env)
+        secret_keys = list(secret_arns_map)
+
+        region_json = _compact_json(aws_region)
+
+        def render_container_def(image_ref, args):
+            port, log_group_name, *values = args
+            env_values = values[:len(env_keys)]
+            secret_values = values[len(env_keys):]
+            return _CONTAINER_DEF_TEMPLATE.format(
+                image=_compact_json(image_ref),
+                port=port,
+                environment=_compact_json([{"name": k, "value": v} for k, v in zip(env_keys, env_values)]),
+                secrets=_compact_json([{"name": k, "valueFrom": v} for k, v in zip(secret_keys, secret_values)]),
+                log_group=_compact_json(log_group_name),
+                region=region_json,
+            )
+
+        container_inputs = [app_args.app_port, log_group.name, *app_args.env.values(), *secret_arns_map.values()]
+        if isinstance(image_url, pulumi.Output):
+            container_def = pulumi.Output.all(image_url, *container_inputs).apply(
+                lambda args: render_container_def(args[0], args[1:])
+            )
+        else:
+            container_def = pulumi.Output.all(*container_inputs).apply(
+                lambda args: render_container_def(image_url, args)
+            )
 
         task_def = aws.ecs.TaskDefinition(f"{name}-task",
             family=f"{name}-task",
-            cpu=cpu,
-            memory=memory,
+            cpu=app_args.cpu,
+            memory=app_args.memory,
             network_mode="awsvpc",
             requires_compatibilities=["FARGATE"],
             execution_role_arn=task_exec_role.arn,
@@ -339,7 +522,7 @@ class ContainerApp(pulumi.ComponentResource):
         # (10) ECS Service
         service = aws.ecs.Service(f"{name}-service",
             cluster=cluster.arn,
-            desired_count=desired_count,
+            desired_count=app_args.desired_count,
             launch_type="FARGATE",
             task_definition=task_def.arn,
             network_configuration={
@@ -350,24 +533,25 @@ class ContainerApp(pulumi.ComponentResource):
             load_balancers=[{
                 "target_group_arn": target_group.arn,
                 "container_name": "app",
-                "container_port": int(app_port)  # Ensure port is integer
+                "container_port": app_args.app_port
             }],
             health_check_grace_period_seconds=120,  # Add grace period for health checks
             tags=common_tags,
             opts=ResourceOptions(
                 parent=self,
-                depends_on=[alb]
+                # The service only needs the target group attached to a listener
+                depends_on=listeners
             )
         )
 
         # Output the load balancer endpoint URL
         self.url = alb.dns_name.apply(
-            lambda dns: f"https://{dns}" if alb_cert_arn else f"http://{dns}"
+            lambda dns: f"https://{dns}" if app_args.alb_cert_arn else f"http://{dns}"
         )
         
         # Output the metrics dashboard URL
-        self.metrics_url = pulumi.Output.all(aws_region, service.name, cluster.name).apply(
-            lambda args: f"https://{args[0]}.console.aws.amazon.com/ecs/home?region={args[0]}#/clusters/{args[2]}/services/{args[1]}/metrics"
+        self.metrics_url = pulumi.Output.all(service.name, cluster.name).apply(
+            lambda args: f"https://{aws_region}.console.aws.amazon.com/ecs/home?region={aws_region}#/clusters/{args[1]}/services/{args[0]}/metrics"
         )
         
         self.register_outputs({